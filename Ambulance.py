@@ -1,11 +1,29 @@
 import math
-from sympy import symbols, Eq, solve  # for solving equations
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import networkx as nx
+import numpy as np
+
+# number of unit time steps the ambulance moves between two drawings
+RENDER_EVERY_N = 1
 
 
 def find_distance(p1, p2):
-    return math.sqrt((p2[0] - p1[0]) ** 2 + (p2[1] - p1[1]) ** 2)
+    return math.hypot(p2[0] - p1[0], p2[1] - p1[1])
+
+
+# find_distance for arrays of points, with x and y on the last axis
+def find_distances(p1, p2):
+    d = np.asarray(p2) - np.asarray(p1)
+    return np.hypot(d[..., 0], d[..., 1])
+
+
+# point at the given distance from p1 on the way to p2
+def advance(p1, p2, distance):
+    dx = p2[0] - p1[0]
+    dy = p2[1] - p1[1]
+    norm = math.hypot(dx, dy)
+    return p1[0] + distance * dx / norm, p1[1] + distance * dy / norm
 
 
 class Ambulance(object):
@@ -21,26 +39,20 @@ class Ambulance(object):
     # to travel from source node to destination
     def drive_to_destination(self):
         final_best_path = [self.source]
+        self.select_best_path()
         while not self.position == self.destination:
-            self.best_path = self.road_map.select_best_path(self.position, self.destination)
-            path = self.draw_best_path_edge()
+            self.draw_best_path_edge()
 
             next_node = self.best_path[1]
             final_best_path.append(next_node)
 
-            x, y = symbols('x y')
-            coeff1 = next_node[1] - self.position[1]
-            coeff2 = next_node[0] - self.position[0]
-            eq1 = Eq(coeff1 * x - coeff2 * y, coeff1 * self.position[0] - coeff2 * self.position[1])
-
-            point = plt.plot(self.position[0], self.position[1], marker='o', color='g')
+            self.draw_ambulance()
 
+            # the ambulance covers RENDER_EVERY_N steps per simulation event and is drawn once per event
+            frame_distance = self.speed * RENDER_EVERY_N
             while not self.position == next_node:
-                for p in point:
-                    p.set_visible(False)
-
                 dist_from_next_node = find_distance(self.position, next_node)
-                if dist_from_next_node <= self.speed:
+                if dist_from_next_node <= frame_distance:
                     time_to_reach_dest = dist_from_next_node / self.speed
 
                     # hold time to reach next node from current position
@@ -48,68 +60,89 @@ class Ambulance(object):
                     self.position = next_node
 
                 else:
-                    eq2 = Eq((x - self.position[0]) ** 2 + (y - self.position[1]) ** 2, self.speed ** 2)
-                    sol = solve((eq1, eq2), (x, y))
-                    dist_with_next_node = {}
-                    for (x_val, y_val) in sol:
-                        # x, y have already been used as symbols above!
-                        x1 = x_val.evalf()
-                        y1 = y_val.evalf()
-                        dist_with_next_node[(x1, y1)] = find_distance((x1, y1), next_node)
-                    yield self.env.timeout(1)
+                    yield self.env.timeout(RENDER_EVERY_N)
+                    self.position = advance(self.position, next_node, frame_distance)
 
-                    # the above two equations solve for two co-ordinate pairs,
-                    # finding which point moves the ambulance towards next node
-                    self.position = min(dist_with_next_node.items(), key=lambda k: k[1])[0]
+                self.draw_ambulance()
+                # the simulation environment already paces the steps, so only pending GUI events are handled
+                self.fig.canvas.flush_events()
 
-                point = plt.plot(self.position[0], self.position[1], marker='o', color='g')
-                plt.pause(0.1)
-
-            path.remove()
+            self.path_lines.set_segments([])
 
             node_labels = nx.get_node_attributes(self.road_map.graph, 'traffic_cong')
             self.road_map.update_congestion()
-            updated_node_labels = nx.get_node_attributes(self.road_map.graph, 'traffic_cong')
 
-            mapping = {}
-            for key in set(node_labels.keys()) & set(updated_node_labels.keys()):
-                mapping[node_labels[key]] = updated_node_labels[key]
+            mapping = {node_labels[node]: traffic_cong
+                       for node, traffic_cong in self.road_map.graph.nodes(data='traffic_cong')}
             print(f"mapping:{mapping}")
-            # nx.relabel_nodes(self.road_map.graph, mapping)
+            # the labels are redrawn along with the next best path
+            self.update_labels()
+
+            # new traffic can make another path cheaper, so the best path is searched again
+            self.select_best_path()
         print(final_best_path)
 
-    def draw_road_map(self):
-        positions = self.get_node_positions()
+    def select_best_path(self):
+        self.best_path = self.road_map.select_best_path(self.position, self.destination)
 
-        nx.draw(self.road_map.graph, with_labels=True, pos=positions)
-        node_labels = nx.get_node_attributes(self.road_map.graph, 'traffic_cong')
-        nx.draw_networkx_labels(self.road_map.graph.nodes, pos=positions, labels=node_labels, font_color='w')
+    def draw_road_map(self):
+        # the ambulance owns its figure and axes and draws through them instead of the pyplot state
+        self.fig = plt.figure()
+        self.ax = self.fig.add_axes((0, 0, 1, 1))
+        self.ax.set_axis_off()
+
+        # the roads never change, so they are drawn once as a single collection of line segments
+        self.road_lines = LineCollection(self.road_map.xy[self.road_map.edge_index], linewidths=1, colors='k',
+                                         zorder=1)
+        self.ax.add_collection(self.road_lines)
+        # the best path is highlighted by swapping the segments of a single collection
+        self.path_lines = LineCollection([], linewidths=10, alpha=0.5, colors='r', zorder=1)
+        self.ax.add_collection(self.path_lines)
+        # all nodes as one scatter and plain text labels, without going through networkx's drawing helpers
+        self.ax.scatter(self.road_map.xy[:, 0], self.road_map.xy[:, 1], s=300, c='#1f78b4', zorder=2)
+        for node in self.road_map.graph.nodes:
+            self.ax.text(node[0], node[1], str(node), size=12, ha='center', va='center', clip_on=True)
+        # the data limits are padded by 5% of the extent of the map, as networkx does, so that the nodes
+        # and labels at its edges are not cut off
+        (min_x, min_y), (max_x, max_y) = self.road_map.xy.min(axis=0), self.road_map.xy.max(axis=0)
+        pad_x, pad_y = 0.05 * (max_x - min_x), 0.05 * (max_y - min_y)
+        self.ax.update_datalim(((min_x - pad_x, min_y - pad_y), (max_x + pad_x, max_y + pad_y)))
+        self.ax.autoscale_view()
+
+        # the label texts are kept so that new congestion only changes their text
+        self.label_artists = {node: self.ax.text(node[0], node[1], str(traffic_cong), size=12, color='w',
+                                                 ha='center', va='center', clip_on=True)
+                              for node, traffic_cong in self.road_map.graph.nodes(data='traffic_cong')}
 
         plt.ion()
         plt.show()
-        plt.pause(0.1)
 
-    def get_node_positions(self):
-        positions = dict()
-        for node in self.road_map.graph.nodes:
-            positions[node] = node
+        # a single marker is moved around instead of plotting a new one on every step
+        self.marker, = self.ax.plot([self.position[0]], [self.position[1]], marker='o', color='g', animated=True)
+        self.update_background()
 
-        return positions
+    def update_labels(self):
+        for node, traffic_cong in self.road_map.graph.nodes(data='traffic_cong'):
+            self.label_artists[node].set_text(traffic_cong)
 
-    def get_edge_list_from_path(self):
-        best_path_edge = list()
-        for i in range((len(self.best_path) - 1)):
-            temp_edge = (self.best_path[i], self.best_path[i + 1])
-            best_path_edge.append(temp_edge)
+    # the static map is cached, so that only the ambulance has to be redrawn on every step
+    def update_background(self):
+        self.fig.canvas.draw()
+        self.background = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+        # unlike plt.pause, this shows the new drawing without sleeping
+        self.fig.canvas.flush_events()
 
-        return best_path_edge
+    def draw_ambulance(self):
+        self.marker.set_data([self.position[0]], [self.position[1]])
+        self.fig.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.marker)
+        self.fig.canvas.blit(self.ax.bbox)
 
-    def draw_best_path_edge(self):
-        best_path_edge = self.get_edge_list_from_path()
+    def get_edge_list_from_path(self):
+        return list(zip(self.best_path, self.best_path[1:]))
 
-        path = nx.draw_networkx_edges(self.road_map.graph, pos=self.get_node_positions(),
-                                      edgelist=best_path_edge,
-                                      width=10, alpha=0.5, edge_color='r')
-        plt.pause(0.1)
-        return path
+    def draw_best_path_edge(self):
+        # nodes are their own co-ordinates, so the edges are already line segments
+        self.path_lines.set_segments(self.get_edge_list_from_path())
+        self.update_background()
 
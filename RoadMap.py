@@ -1,60 +1,74 @@
-import networkx as nx
-import random
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+# weights of normalized distance and node traffic in the cost of a road
+PATH_COST_WEIGHT = 1
+TRAFFIC_WEIGHT = 2
 
 
 class RoadMap(object):
     def __init__(self, graph):
         self.graph = graph
+        # traffic is kept in an array indexed by node
+        self._nodes_list = list(self.graph.nodes)
+        self.node_index = {node: i for i, node in enumerate(self._nodes_list)}
+        # node co-ordinates as one contiguous array, row i being the node with index i
+        self.xy = np.asarray(self._nodes_list, dtype=np.int32).reshape(-1, 2)
+        self._traffic = np.array([cong for _, cong in self.graph.nodes(data='traffic_cong')], dtype=np.int32)
 
-    def update_congestion(self):
-        for node in self.graph.nodes.data():
-            node[1]['traffic_cong'] = random.randint(0, 100)
-
-    def find_path_cost(self, path):
-        path_cost = 0
-        for i in range(len(path) - 1):
-            path_cost += (self.graph.edges[path[i], path[i + 1]])[
-                'weight']  # graph.edges[path[i], path[i+1]] returns a dictionary
-
-        return path_cost
-
-    def find_path_traffic(self, path):
-        path_traffic = 0
-        for i in range(len(path) - 1):
-            path_traffic += self.graph.nodes[path[i]]['traffic_cong']
-        return path_traffic
-
-    def find_cost_of_all_path(self, source, destiny):
-        path_costs = {}
-        if nx.has_path(self.graph, source, destiny):
-
-            # possible path is a generator object
-            possible_path = nx.all_simple_paths(self.graph, source, destiny)
-            path_costs = {}
-            for path in possible_path:
-                path_costs[tuple(path)] = [self.find_path_cost(path),
-                                           self.find_path_traffic(path)]
+        # node indices of the two ends of every road
+        self._edges_list = list(self.graph.edges)
+        self.edge_index = np.array([(self.node_index[u], self.node_index[v]) for u, v in self._edges_list],
+                                   dtype=np.intp).reshape(-1, 2)
 
-        else:
-            # you can throw exception if you want
-            print("No path exists")
-        return path_costs
+        # road lengths as given by the 'weight' attribute of the graph, in the order of _edges_list
+        edge_length = np.array([weight for _, _, weight in self.graph.edges(data='weight')], dtype=float)
 
-    def select_best_path(self, source, destiny):
-        path_with_cost_traffic = self.find_cost_of_all_path(source, destiny)
+        # road lengths are static, so they are normalized against the longest road only once
+        max_edge_length = edge_length.max() if len(edge_length) else 1
+        self._norm_weight = (edge_length / max_edge_length) * 100 * PATH_COST_WEIGHT
 
-        if len(path_with_cost_traffic):
-            max_path_cost = max(path_with_cost_traffic.values(), key=lambda v: v[0])[0]
+        # adjacency matrix with every road in both directions, searched by scipy's dijkstra;
+        # its structure is fixed, so new traffic only rewrites its data in place
+        rows = np.concatenate((self.edge_index[:, 0], self.edge_index[:, 1]))
+        cols = np.concatenate((self.edge_index[:, 1], self.edge_index[:, 0]))
+        self._csr_order = np.lexsort((cols, rows))
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(self._nodes_list)))))
+        self._road_matrix = csr_matrix((np.zeros(len(rows)), cols[self._csr_order], indptr),
+                                       shape=(len(self._nodes_list), len(self._nodes_list)))
+        self.update_combined_weight()
 
-            for path, cost_traffic in path_with_cost_traffic.items():
-                # normalizing path cost
-                normalized_path_cost = (cost_traffic[0] / max_path_cost) * 100
-                total_cost = normalized_path_cost + cost_traffic[1] * 2
-                cost_traffic.append(total_cost)
+    def update_congestion(self):
+        traffic = np.random.randint(0, 101, size=len(self._nodes_list))
+        self._traffic[:] = traffic
 
-            # min function only returns a single value even if multiple min exists. So, no handling is done.
-            min_tot_cost_path = min(path_with_cost_traffic.items(), key=lambda x: x[1][2])
-            return min_tot_cost_path[0]
-        else:
+        # node attributes are still read when drawing the labels
+        for node, traffic_cong in zip(self._nodes_list, traffic.tolist()):
+            self.graph.nodes[node]['traffic_cong'] = traffic_cong
+        self.update_combined_weight()
+
+    # cost of a road used by the shortest path search; as roads can be driven both ways,
+    # the traffic of a road is taken as the average of the traffic at its two ends
+    def update_combined_weight(self):
+        road_traffic = self._traffic[self.edge_index].sum(axis=1) / 2
+        combined = self._norm_weight + TRAFFIC_WEIGHT * road_traffic
+        self._road_matrix.data[:] = np.concatenate((combined, combined))[self._csr_order]
+
+    def select_best_path(self, source, destiny):
+        source_index = self.node_index[source]
+        destiny_index = self.node_index[destiny]
+        _, predecessors = dijkstra(self._road_matrix, indices=source_index, return_predecessors=True)
+
+        if source_index != destiny_index and predecessors[destiny_index] < 0:
+            # you can throw exception if you want
             print("No path exists")
-            return tuple()
+            best_path = tuple()
+        else:
+            # walk the shortest path tree back from destiny to source
+            path = [destiny_index]
+            while path[-1] != source_index:
+                path.append(predecessors[path[-1]])
+            best_path = tuple(self._nodes_list[i] for i in reversed(path))
+
+        return best_path
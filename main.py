@@ -1,55 +1,61 @@
-from Ambulance import Ambulance
+from Ambulance import Ambulance, find_distances
 from RoadMap import RoadMap
+import functools
+import os
 import networkx as nx
-import csv
-import math
+import numpy as np
 import simpy
 import matplotlib.pyplot as plt
 
-fig = plt.figure()
+POINTS_FILE = "points.csv"
+ROADS_FILE = "roads.csv"
 
 
-def find_distance(p1, p2):
-    return math.sqrt((p2[0] - p1[0]) ** 2 + (p2[1] - p1[1]) ** 2)
+# the modification times are part of the key, so edited files are read again
+@functools.lru_cache(maxsize=4)
+def _load_graph(points_path, roads_path, points_mtime, roads_mtime):
+    myGraph = nx.Graph()
 
+    # columns x, y and Congestion, skipping the first row containing headers
+    points = np.loadtxt(points_path, dtype=np.int64, delimiter=',', skiprows=1, usecols=(0, 1, 4), ndmin=2)
+    myGraph.add_nodes_from(((x, y), {'traffic_cong': traffic_cong}) for x, y, traffic_cong in points.tolist())
 
-def generate_graph():
-    myGraph = nx.Graph()
+    # columns start_x, start_y, end_x and end_y
+    roads = np.loadtxt(roads_path, dtype=np.int64, delimiter=',', skiprows=1, usecols=(1, 2, 3, 4), ndmin=2)
+    distances = find_distances(roads[:, :2], roads[:, 2:])
+    myGraph.add_weighted_edges_from(zip(map(tuple, roads[:, :2].tolist()),
+                                        map(tuple, roads[:, 2:].tolist()),
+                                        distances.tolist()))
+    return myGraph
 
-    # context manager, so that when we are done reading the file, it is closed
-    with open("points.csv", "r") as f:
-        points = csv.reader(f)
 
-        # to skip the first row containing headers
-        next(points)
+def generate_graph():
+    myGraph = _load_graph(POINTS_FILE, ROADS_FILE, os.path.getmtime(POINTS_FILE), os.path.getmtime(ROADS_FILE))
+    # RoadMap writes congestion into the graph, so every run gets its own copy
+    return myGraph.copy()
 
-        for row in points:
-            myGraph.add_node((int(row[0]), int(row[1])), traffic_cong=int(row[4]))
 
-    with open("roads.csv", "r") as f:
-        roads = csv.reader(f)
-        next(roads)
-        for row in roads:
-            p1 = (int(row[1]), int(row[2]))
-            p2 = (int(row[3]), int(row[4]))
-            distance = find_distance(p1, p2)
-            myGraph.add_edge(p1, p2, weight=distance)
-    return myGraph
+def main_function(source, destination, ambulance_speed=30):
+    myGraph = generate_graph()
+
+    # main execution code
+    env = simpy.rt.RealtimeEnvironment(factor=0.1, strict=False)
+    my_road = RoadMap(myGraph)
+    my_ambulance = Ambulance(env, my_road, ambulance_speed, source, destination) # roadmap should have been drawn
+    my_ambulance.env.process(my_ambulance.drive_to_destination())
+    my_ambulance.env.run()
+    # the process may run further simulations, which draw on a figure of their own
+    plt.close(my_ambulance.fig)
 
 
-myGraph = generate_graph()
+if __name__ == "__main__":
+    # user inputs
+    ambulance_speed = 30
+    source = (250, 500)
+    destination = (1000, 500)
 
-# user inputs
-ambulance_speed = 30
-source = (250, 500)
-destination = (1000, 500)
+    main_function(source, destination, ambulance_speed)
 
-# main execution code
-env = simpy.rt.RealtimeEnvironment(factor=0.1, strict=False)
-my_road = RoadMap(myGraph)
-my_ambulance = Ambulance(env, my_road, ambulance_speed, source, destination) # roadmap should have been drawn
-my_ambulance.env.process(my_ambulance.drive_to_destination())
-my_ambulance.env.run()
 #
 # nodeList = list(myGraph.nodes)
 # edgeList = list(myGraph.edges)
@@ -1,59 +1,125 @@
 from tkinter import *
+from tkinter.ttk import Progressbar
 #from tkinter.ttk import Combobox
-#import main as m
-import csv
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 
-window=Tk()
-window.configure(background='light blue')
+# location name -> (x, y), read once instead of on every click
+def load_points():
+	with open("points.csv", "r", newline='') as f:
+		# skipping the first row containing headers
+		lines = f.read().splitlines()[1:]
+	# the file has no quoted fields, so splitting on commas is enough; columns x, y and Name
+	return {row[5]: (int(row[0]), int(row[1])) for row in (line.split(',') for line in lines if line)}
+
+points_error = None
+try:
+	coordinates = load_points()
+except FileNotFoundError as e:
+	# reported when driving is started
+	coordinates = {}
+	points_error = e
+
+executor = None
+simulation = None
+
+def run_simulation(sour, dest):
+	# the simulation pulls in matplotlib, networkx and simpy, so it is only imported in its own process
+	# and the window shows up without waiting for them
+	import main as m
+	m.main_function(sour,dest)
 
 def start():
-	if (destination.get() == "" and source.get() == "") or (destination.get()==source.get()):
+	global executor, simulation
+	if simulation is not None and not simulation.done():
+		print("already driving")
+		return
+	if points_error is not None:
+		print(points_error)
+		return
+	# the table is a dict, so checking that a location exists is a single hash lookup
+	if destination.get() not in coordinates or source.get() not in coordinates or (destination.get()==source.get()):
 		print("empty/invalid inputs")
+		return
 		
-	with open("points.csv", "r") as f:
-		roads = csv.reader(f)
-		next(roads)
-		for row in roads:
-			if destination.get() == row[5]:
-				dest=(row[0],row[1])
-			if source.get()==row[5]:
-				sour=(row[0],row[1])
-		print(dest)
-		print(sour)
-	#calling the main funtion in main.py ... we have to make main_function in main.py
-	#m.main_function(sour,dest)
+	dest = coordinates[destination.get()]
+	sour = coordinates[source.get()]
+	print(dest)
+	print(sour)
+	# matplotlib needs the main thread of its own process, so the simulation runs in a separate
+	# process and the window stays responsive meanwhile; the one worker is kept for the whole session,
+	# so only the first simulation pays for importing the simulation modules and reading the map
+	if executor is None:
+		executor = concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+	simulation = executor.submit(run_simulation, sour, dest)
+	progress.place(x=100, y=450)
+	progress.start()
+	window.after(50, check_simulation)
+
+def check_simulation():
+	global executor
+	if not simulation.done():
+		window.after(50, check_simulation)
+	else:
+		progress.stop()
+		progress.place_forget()
+		if simulation.exception() is not None:
+			print(simulation.exception())
+			# a worker that died leaves the pool unusable, so the next simulation starts a new one
+			if isinstance(simulation.exception(), BrokenProcessPool):
+				executor.shutdown(wait=False)
+				executor = None
+
+# a running simulation would keep the interpreter from exiting until it finishes, so its worker is stopped
+def close():
+	if executor is not None:
+		executor.shutdown(wait=False, cancel_futures=True)
+		for process in multiprocessing.active_children():
+			process.terminate()
+	window.destroy()
+
+# the spawned simulation process imports this module again, which must not open another window
+if __name__ == "__main__":
+	window=Tk()
+	window.configure(background='light blue')
+
+	var = StringVar()
+	var.set("Pulchowk")
+	# the location names come from the same table the inputs are checked against
+	data=tuple(coordinates)
 
-var = StringVar()
-var.set("Pulchowk")
-data=("Pulchowk", "Baneswor", "Thapathali", "Maitighar","Jawlakhel","Kupondole")
 
+	lbl=Label(window, text="Ambulance GIS System", fg='black', font=("Helvetica", 20),bg='light blue')
+	lbl.place(x=70, y=20)
 
-lbl=Label(window, text="Ambulance GIS System", fg='black', font=("Helvetica", 20),bg='light blue')
-lbl.place(x=70, y=20)
+	lbl=Label(window, text="Destination", fg='black', font=("Helvetica", 10),bg='light blue')
+	lbl.place(x=160, y=130)
+	destination=Entry()
+	destination.place(x=140,y=150)
+	d=destination.get()
 
-lbl=Label(window, text="Destination", fg='black', font=("Helvetica", 10),bg='light blue')
-lbl.place(x=160, y=130)
-destination=Entry()
-destination.place(x=140,y=150)
-d=destination.get()
 
+	#cb=Combobox(window, values=data)
+	#cb.place(x=60, y=150)
 
-#cb=Combobox(window, values=data)
-#cb.place(x=60, y=150)
+	lbl1=Label(window, text="Where are you?", fg='black', font=("Helvetica", 10), bg='light blue')
+	lbl1.place(x=150, y=280)
+	source=Entry()
+	source.place(x=140,y=300)
+	s=source.get()
 
-lbl1=Label(window, text="Where are you?", fg='black', font=("Helvetica", 10), bg='light blue')
-lbl1.place(x=150, y=280)
-source=Entry()
-source.place(x=140,y=300)
-s=source.get()
+	#cb1=Combobox(window, values=data)
+	#cb1.place(x=60, y=300)
 
-#cb1=Combobox(window, values=data)
-#cb1.place(x=60, y=300)
 
+	btn=Button(window, text="Start Driving", fg='white',bg='black',command=start)
+	btn.place(x=160, y=400)
 
-btn=Button(window, text="Start Driving", fg='white',bg='black',command=start)
-btn.place(x=160, y=400)
+	# shown while a simulation is running
+	progress=Progressbar(window, mode='indeterminate', length=200)
 
-window.title('Ambulance GIS System')
-window.geometry("400x500+10+10")
-window.mainloop()
\ No newline at end of file
+	window.title('Ambulance GIS System')
+	window.geometry("400x500+10+10")
+	window.protocol("WM_DELETE_WINDOW", close)
+	window.mainloop()
\ No newline at end of file